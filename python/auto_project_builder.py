@@ -8,34 +8,65 @@ RedshiftManager Auto Project Builder
 """
 
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# תבניות placeholder — מוגדרות פעם אחת במקום f-string מחדש בכל איטרציה
+MODEL_PLACEHOLDER_TMPL = '''"""
+{title} Module
+נא להעתיק את התוכן מ-Claude Artifacts
+"""
+
+# חפש ב-Claude artifacts:
+# "{search}"
+
+print("⚠️  {filename} - קובץ placeholder")
+print("📋 העתק את התוכן מ-Claude Artifacts")
+'''
+
+PAGE_PLACEHOLDER_TMPL = '''"""
+{title} 
+נא להעתיק את התוכן מ-Claude Artifacts
+"""
+
+import streamlit as st
+
+def show_{func}():
+    st.error("❌ דף לא הושלם!")
+    st.info("📋 העתק את התוכן מ-Claude Artifacts")
+    st.info(f"🎯 חפש: '{search}'")
+
+if __name__ == "__main__":
+    show_{func}()
+'''
+
 def create_directory_structure():
     """יוצר את מבנה התיקיות"""
     base_dir = Path("RedshiftManager")
-    
+
+    # רק תיקיות העלים — parents=True כבר יוצר את base_dir בדרך,
+    # אז אין צורך ב-mkdir נפרד לכל רמה
     directories = [
-        base_dir,
         base_dir / "models",
-        base_dir / "pages", 
+        base_dir / "pages",
         base_dir / "config",
         base_dir / "logs",
         base_dir / "data",
         base_dir / "backup"
     ]
-    
+
     for directory in directories:
         directory.mkdir(parents=True, exist_ok=True)
         print(f"📁 {directory}")
-    
+
     return base_dir
 
 def create_file(path, content, description=""):
     """יוצר קובץ עם תוכן"""
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        Path(path).write_text(content, encoding='utf-8')
         print(f"✅ {path} {description}")
         return True
     except Exception as e:
@@ -232,11 +263,6 @@ st.code("""
         (base_dir / "main.py", main_py_placeholder, "- אפליקציה ראשית (PLACEHOLDER)")
     ]
     
-    success_count = 0
-    for file_path, content, desc in files_to_create:
-        if create_file(file_path, content, desc):
-            success_count += 1
-    
     # יצירת קבצי placeholder למודלים
     model_placeholders = [
         "database_models.py",
@@ -246,19 +272,12 @@ st.code("""
     ]
     
     for model_file in model_placeholders:
-        placeholder_content = f'''"""
-{model_file.replace('.py', '').title()} Module
-נא להעתיק את התוכן מ-Claude Artifacts
-"""
-
-# חפש ב-Claude artifacts:
-# "{model_file.replace('_', ' ').title().replace('.py', '')}"
-
-print("⚠️  {model_file} - קובץ placeholder")
-print("📋 העתק את התוכן מ-Claude Artifacts")
-'''
-        create_file(base_dir / "models" / model_file, placeholder_content, f"- {model_file} placeholder")
-        success_count += 1
+        placeholder_content = MODEL_PLACEHOLDER_TMPL.format(
+            title=model_file.replace('.py', '').title(),
+            search=model_file.replace('_', ' ').title().replace('.py', ''),
+            filename=model_file
+        )
+        files_to_create.append((base_dir / "models" / model_file, placeholder_content, f"- {model_file} placeholder"))
     
     # יצירת קבצי placeholder לדפים
     page_placeholders = [
@@ -271,23 +290,18 @@ print("📋 העתק את התוכן מ-Claude Artifacts")
     ]
     
     for page_file in page_placeholders:
-        placeholder_content = f'''"""
-{page_file.replace('.py', '').replace('_', ' ').title()} 
-נא להעתיק את התוכן מ-Claude Artifacts
-"""
-
-import streamlit as st
-
-def show_{page_file.replace('.py', '')}():
-    st.error("❌ דף לא הושלם!")
-    st.info("📋 העתק את התוכן מ-Claude Artifacts")
-    st.info(f"🎯 חפש: '{page_file.replace('_', ' ').title().replace('.py', '')}'")
-
-if __name__ == "__main__":
-    show_{page_file.replace('.py', '')}()
-'''
-        create_file(base_dir / "pages" / page_file, placeholder_content, f"- {page_file} placeholder")
-        success_count += 1
+        placeholder_content = PAGE_PLACEHOLDER_TMPL.format(
+            title=page_file.replace('.py', '').replace('_', ' ').title(),
+            func=page_file.replace('.py', ''),
+            search=page_file.replace('_', ' ').title().replace('.py', '')
+        )
+        files_to_create.append((base_dir / "pages" / page_file, placeholder_content, f"- {page_file} placeholder"))
+
+    # כתיבה מקבילה — הזמן נשלט ע"י syscalls של הקבצים, לא CPU,
+    # אז חפיפת הכתיבות מסתירה את ה-latency של מערכת הקבצים
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda item: create_file(*item), files_to_create))
+    success_count = sum(results)
     
     # יצירת קובץ הוראות
     instructions_content = f"""
@@ -343,6 +357,12 @@ if __name__ == "__main__":
     print("5. הרץ run.bat")
     print("\n🎉 בהצלחה!")
 
-if __name__ == "__main__":
+def main(interactive=True):
+    """נקודת כניסה — interactive=False מאפשר הרצה מסקריפטים/CI בלי המתנה ל-Enter"""
     build_project()
-    input("\nלחץ Enter ליציאה...")
+    if interactive and sys.stdin.isatty():
+        input("\nלחץ Enter ליציאה...")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,23 @@ REDSHIFT_CONFIG = {
     "port": 5439,
     "dbname": "dev",
     "user": "your_username",
-    "password": "your_password"
+    "password": "your_password",
+    # keepalives מונעים מה-load balancer לקטוף את החיבור באמצע ריצה
+    # ארוכה — reconnect עולה SSL handshake מלא מול Redshift
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+    "sslmode": "require",
+    # שם מזוהה ב-WLM — מאפשר לתעדף ולאתר את ה-sessions של הכלי
+    "application_name": "datashare-updater",
 }
 
 DATASHARE_NAME = "my_database_share"
 
 # מצב ריצה: True = Dry Run, False = ביצוע אמיתי
 DRY_RUN = True
+
+# גילוי סכמות דרך ה-metadata API של redshift_connector (get_schemas)
+# במקום SHOW SCHEMAS ב-psycopg2; אם הדרייבר לא מותקן נופלים ל-psycopg2
+USE_DRIVER_METADATA_API = False
@@ -1,8 +1,14 @@
-import oracledb
+import logging
+
+_log = logging.getLogger(__name__)
+
 
 class OracleConnection:
     """חיבור יחיד ל-Oracle עם Connection ID משלך."""
 
+    # pool משותף לכל המופעים, לפי (dsn, user) — חוסך authentication מלא בכל open()
+    _pools = {}
+
     def __init__(self, dsn, user, password, prefix="CONN"):
         self.dsn = dsn
         self.user = user
@@ -10,21 +16,43 @@ class OracleConnection:
         self.prefix = prefix
         self.connection_id = f"{prefix}-000001"
         self.connection = None
+        self._pool = None
+        self._cur = None
+
+    @classmethod
+    def get_pool(cls, dsn, user, password):
+        """מחזיר SessionPool משותף; נבנה בעצלתיים בפעם הראשונה."""
+        import oracledb
+        key = (dsn, user)
+        pool = cls._pools.get(key)
+        if pool is None:
+            pool = oracledb.create_pool(
+                user=user,
+                password=password,
+                dsn=dsn,
+                min=1,
+                max=10,
+                increment=1
+            )
+            cls._pools[key] = pool
+        return pool
 
     def open(self):
         """פותח חיבור יחיד ל-Oracle ומגדיר Client Identifier."""
+        # ייבוא עצל: oracledb הוא C extension כבד, נטען רק כשבאמת מתחברים
+        import oracledb
         try:
-            self.connection = oracledb.connect(
-                user=self.user,
-                password=self.password,
-                dsn=self.dsn
-            )
+            self._pool = OracleConnection.get_pool(self.dsn, self.user, self.password)
+            self.connection = self._pool.acquire()
+            # cache של statements מנותחים — חוסך soft parse בשאילתות חוזרות
+            self.connection.stmtcachesize = 50
             print(f"[{self.connection_id}] Connected to Oracle.")
 
+            # קורסור יחיד לכל החיבור — חוסך פתיחה/סגירה בכל קריאה
+            self._cur = self.connection.cursor()
+
             # הגדרת מזהה בחיבור (נראה בצד ה־DB)
-            cur = self.connection.cursor()
-            cur.execute("BEGIN DBMS_SESSION.SET_IDENTIFIER(:id); END;", {"id": self.connection_id})
-            cur.close()
+            self._cur.execute("BEGIN DBMS_SESSION.SET_IDENTIFIER(:id); END;", {"id": self.connection_id})
 
         except oracledb.Error as e:
             print(f"[{self.connection_id}] Failed to connect: {e}")
@@ -35,32 +63,67 @@ class OracleConnection:
         if not self.connection:
             raise RuntimeError("Connection is not open.")
 
-        print(f"[{self.connection_id}] Executing SQL: {sql}")
-        cur = self.connection.cursor()
-        cur.execute(sql, params or {})
-        row = cur.fetchone()
-        cur.close()
+        # logger כבוי מסתיים ב-isEnabledFor לפני כל formatting — בניגוד ל-print
+        _log.debug("[%s] Executing SQL: %s", self.connection_id, sql)
+        # מצפים לשורה אחת — אין טעם ב-prefetch של ברירת המחדל (100 שורות)
+        self._cur.arraysize = 1
+        self._cur.prefetchrows = 1
+        self._cur.execute(sql, params or {})
+        row = self._cur.fetchone()
         return row[0] if row else None
 
-    def execute_nonquery(self, sql, params=None):
-        """מריץ פקודה שלא מחזירה ערך (כמו INSERT / UPDATE / DELETE)."""
+    def execute_nonquery(self, sql, params=None, autocommit=True):
+        """מריץ פקודה שלא מחזירה ערך (כמו INSERT / UPDATE / DELETE).
+
+        autocommit=False מאפשר לעטוף כמה פקודות בטרנזקציה אחת —
+        commit בודד במקום fsync של ה-redo log אחרי כל פקודה.
+        """
         if not self.connection:
             raise RuntimeError("Connection is not open.")
 
-        print(f"[{self.connection_id}] Executing NonQuery: {sql}")
-        cur = self.connection.cursor()
-        cur.execute(sql, params or {})
+        _log.debug("[%s] Executing NonQuery: %s", self.connection_id, sql)
+        self._cur.execute(sql, params or {})
+        if autocommit:
+            self.connection.commit()
+        return self._cur.rowcount
+
+    def execute_many(self, sql, seq_of_params, autocommit=True):
+        """מריץ פקודת DML אחת על אצווה של שורות עם array DML של Oracle.
+
+        הדרך המועדפת ל-INSERT/UPDATE של יותר מ~10 שורות — כל האצווה
+        נשלחת בחבילת רשת אחת במקום round-trip לכל שורה.
+        """
+        if not self.connection:
+            raise RuntimeError("Connection is not open.")
+
+        _log.debug("[%s] Executing Many (%d rows): %s", self.connection_id, len(seq_of_params), sql)
+        self._cur.executemany(sql, seq_of_params)
+        if autocommit:
+            self.connection.commit()
+        return self._cur.rowcount
+
+    def commit(self):
+        """מבצע commit לטרנזקציה הנוכחית."""
+        if not self.connection:
+            raise RuntimeError("Connection is not open.")
         self.connection.commit()
-        affected = cur.rowcount
-        cur.close()
-        return affected
+
+    def rollback(self):
+        """מבטל את הטרנזקציה הנוכחית."""
+        if not self.connection:
+            raise RuntimeError("Connection is not open.")
+        self.connection.rollback()
 
     def close(self):
         """סוגר את החיבור."""
         if self.connection:
             try:
-                self.connection.close()
-                print(f"[{self.connection_id}] Connection closed.")
+                if self._cur:
+                    self._cur.close()
+                    self._cur = None
+                # החיבור חוזר ל-pool במקום להיסגר — ה-open() הבא כמעט חינם
+                self._pool.release(self.connection)
+                print(f"[{self.connection_id}] Connection released to pool.")
             except Exception as e:
                 print(f"[{self.connection_id}] Error closing connection: {e}")
             self.connection = None
@@ -70,6 +133,8 @@ class OracleConnection:
 # דוגמת שימוש
 # ----------------------------
 if __name__ == "__main__":
+    import oracledb
+
     dsn = "myhost:1521/ORCLPDB1"   # לדוגמה: "10.0.0.5:1521/ORCL"
     user = "your_user"
     password = "your_password"
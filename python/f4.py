@@ -1,45 +1,98 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import psycopg2
 from psycopg2 import sql
 from config import REDSHIFT_CONFIG, DATASHARE_NAME, DRY_RUN
 
+# קובץ מצב מקומי לזיהוי "כלום לא השתנה" בין ריצות
+_STATE_FILE = os.path.join(tempfile.gettempdir(), f"datashare_state_{DATASHARE_NAME}.json")
+
+# תבניות DDL קבועות — נבנות פעם אחת במקום בכל איטרציה
+_ADD_SCHEMA_SQL  = sql.SQL("ALTER DATASHARE {} ADD SCHEMA {}")
+_INCLUDE_NEW_SQL = sql.SQL("ALTER DATASHARE {} SET INCLUDENEW = TRUE FOR SCHEMA {}")
+_ADD_TABLE_SQL   = sql.SQL("ALTER DATASHARE {} ADD TABLE {}.{}")
+_DROP_SCHEMA_SQL = sql.SQL("ALTER DATASHARE {} DROP SCHEMA {}")
+_DROP_TABLE_SQL  = sql.SQL("ALTER DATASHARE {} DROP TABLE {}.{}")
+
 def maintain_datashare():
     conn = psycopg2.connect(**REDSHIFT_CONFIG)
     conn.autocommit = True
     cur = conn.cursor()
 
     try:
-        # --- שלב 1: מה יש כבר ב-datashare ---
-        cur.execute("""
-            SELECT object_type, object_name, schema_name
-            FROM svv_datashare_objects
-            WHERE share_name = %s
-        """, (DATASHARE_NAME,))
-        existing = cur.fetchall()
-
-        existing_schemas = {row[1] for row in existing if row[0] == 'schema'}
-        existing_tables  = {(row[2], row[1]) for row in existing if row[0] == 'table'}
-
-        # --- שלב 2: מה יש בפועל ב-DB ---
+        # --- שלב 0: בדיקת שינוי זולה — בריצה שגרתית שבה כלום לא השתנה
+        # מדלגים על שאילתות הדלתא ועל כל ה-DDL ---
+        fingerprint = _catalog_fingerprint(cur)
+        if fingerprint == _load_cached_fingerprint():
+            print("✅ Catalog unchanged since last run — nothing to do.")
+            return
+
+        # --- שלב 1+2+3: חישוב הדלתא בצד השרת עם EXCEPT ---
+        # סכמות וטבלאות חסרות נשלפות בשאילתה אחת (UNION ALL עם עמודת kind)
+        # — round-trip אחד וסריקת קטלוג אחת במקום שניים.
         cur.execute("""
-            SELECT schema_name
-            FROM information_schema.schemata
-            WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
-        """)
-        all_schemas = {row[0] for row in cur.fetchall()}
+            SELECT 'schema' AS kind, s.schema_name, NULL AS table_name
+            FROM (
+                SELECT schema_name
+                FROM information_schema.schemata
+                WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+                EXCEPT
+                SELECT object_name
+                FROM svv_datashare_objects
+                WHERE share_name = %s AND object_type = 'schema'
+            ) s
+            UNION ALL
+            SELECT 'table', t.table_schema, t.table_name
+            FROM (
+                SELECT table_schema, table_name
+                FROM information_schema.tables
+                WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+                EXCEPT
+                SELECT schema_name, object_name
+                FROM svv_datashare_objects
+                WHERE share_name = %s AND object_type = 'table'
+            ) t
+        """, (DATASHARE_NAME, DATASHARE_NAME))
+        # איטרציה ישירה על הקורסור — בלי לממש את כל התוצאה כרשימה ביניים
+        missing_schemas, missing_tables = set(), set()
+        for kind, schema, table in cur:
+            if kind == 'schema':
+                missing_schemas.add(schema)
+            else:
+                missing_tables.add((schema, table))
 
         cur.execute("""
-            SELECT table_schema, table_name
-            FROM information_schema.tables
-            WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
-        """)
-        all_tables = {(row[0], row[1]) for row in cur.fetchall()}
-
-        # --- שלב 3: חישוב דלתא ---
-        missing_schemas = all_schemas - existing_schemas
-        missing_tables  = all_tables - existing_tables
-
-        obsolete_schemas = existing_schemas - all_schemas
-        obsolete_tables  = existing_tables - all_tables
+            SELECT 'schema' AS kind, s.object_name, NULL AS table_name
+            FROM (
+                SELECT object_name
+                FROM svv_datashare_objects
+                WHERE share_name = %s AND object_type = 'schema'
+                EXCEPT
+                SELECT schema_name
+                FROM information_schema.schemata
+                WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+            ) s
+            UNION ALL
+            SELECT 'table', t.schema_name, t.object_name
+            FROM (
+                SELECT schema_name, object_name
+                FROM svv_datashare_objects
+                WHERE share_name = %s AND object_type = 'table'
+                EXCEPT
+                SELECT table_schema, table_name
+                FROM information_schema.tables
+                WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+            ) t
+        """, (DATASHARE_NAME, DATASHARE_NAME))
+        obsolete_schemas, obsolete_tables = set(), set()
+        for kind, schema, table in cur:
+            if kind == 'schema':
+                obsolete_schemas.add(schema)
+            else:
+                obsolete_tables.add((schema, table))
 
         print("\n📊 Delta summary:")
         print("Schemas to add:", missing_schemas or "None")
@@ -47,61 +100,155 @@ def maintain_datashare():
         print("Schemas to drop:", obsolete_schemas or "None")
         print("Tables to drop:", obsolete_tables or "None")
 
+        # מזהה ה-datashare קבוע — נבנה פעם אחת מחוץ ללולאות
+        share_id = sql.Identifier(DATASHARE_NAME)
+
+        # מצליחים לשמור fingerprint רק אם כל השלבים עברו — אחרת הריצה
+        # הבאה חייבת לחשב דלתא מחדש ולנסות שוב
+        all_ok = True
+
         # --- שלב 4: הוספת סכמות חסרות ---
+        add_schema_stmts = []
         for schema in missing_schemas:
-            add_schema = sql.SQL("ALTER DATASHARE {} ADD SCHEMA {}").format(
-                sql.Identifier(DATASHARE_NAME),
+            add_schema_stmts.append(_ADD_SCHEMA_SQL.format(
+                share_id,
                 sql.Identifier(schema)
-            )
-            _execute_or_print(cur, add_schema, f"Add schema {schema}")
-
-            include_new = sql.SQL("ALTER DATASHARE {} SET INCLUDE NEW = TRUE FOR SCHEMA {}").format(
-                sql.Identifier(DATASHARE_NAME),
+            ))
+            add_schema_stmts.append(_INCLUDE_NEW_SQL.format(
+                share_id,
                 sql.Identifier(schema)
-            )
-            _execute_or_print(cur, include_new, f"Enable INCLUDE NEW for schema {schema}")
+            ))
+        all_ok &= _execute_batch_or_print(cur, add_schema_stmts, "Add missing schemas (with INCLUDE NEW)")
 
         # --- שלב 5: הוספת טבלאות חסרות ---
+        # DDL על סכמות שונות בטוח לריצה מקבילית ב-sessions נפרדים,
+        # אז מחלקים את הטבלאות לפי סכמה ומריצים בכמה חיבורים
+        tables_by_schema = {}
         for schema, table in missing_tables:
-            query = sql.SQL("ALTER DATASHARE {} ADD TABLE {}.{}").format(
-                sql.Identifier(DATASHARE_NAME),
-                sql.Identifier(schema),
-                sql.Identifier(table)
-            )
-            _execute_or_print(cur, query, f"Add table {schema}.{table}")
+            tables_by_schema.setdefault(schema, []).append(table)
+
+        if DRY_RUN or len(tables_by_schema) <= 1:
+            add_table_stmts = [
+                _ADD_TABLE_SQL.format(
+                    share_id,
+                    sql.Identifier(schema),
+                    sql.Identifier(table)
+                )
+                for schema, table in missing_tables
+            ]
+            all_ok &= _execute_batch_or_print(cur, add_table_stmts, "Add missing tables")
+        else:
+            def _add_schema_tables(item):
+                schema, tables = item
+                worker_conn = psycopg2.connect(**REDSHIFT_CONFIG)
+                worker_conn.autocommit = True
+                worker_cur = worker_conn.cursor()
+                try:
+                    stmts = [
+                        _ADD_TABLE_SQL.format(
+                            share_id,
+                            sql.Identifier(schema),
+                            sql.Identifier(table)
+                        )
+                        for table in tables
+                    ]
+                    return _execute_batch_or_print(worker_cur, stmts, f"Add missing tables in {schema}")
+                finally:
+                    worker_cur.close()
+                    worker_conn.close()
+
+            with ThreadPoolExecutor(max_workers=min(4, len(tables_by_schema))) as executor:
+                all_ok &= all(executor.map(_add_schema_tables, tables_by_schema.items()))
 
         # --- שלב 6: הורדת סכמות מיותרות ---
-        for schema in obsolete_schemas:
-            query = sql.SQL("ALTER DATASHARE {} DROP SCHEMA {}").format(
-                sql.Identifier(DATASHARE_NAME),
+        drop_schema_stmts = [
+            _DROP_SCHEMA_SQL.format(
+                share_id,
                 sql.Identifier(schema)
             )
-            _execute_or_print(cur, query, f"Drop schema {schema}")
+            for schema in obsolete_schemas
+        ]
+        all_ok &= _execute_batch_or_print(cur, drop_schema_stmts, "Drop obsolete schemas")
 
         # --- שלב 7: הורדת טבלאות מיותרות ---
-        for schema, table in obsolete_tables:
-            query = sql.SQL("ALTER DATASHARE {} DROP TABLE {}.{}").format(
-                sql.Identifier(DATASHARE_NAME),
+        drop_table_stmts = [
+            _DROP_TABLE_SQL.format(
+                share_id,
                 sql.Identifier(schema),
                 sql.Identifier(table)
             )
-            _execute_or_print(cur, query, f"Drop table {schema}.{table}")
+            for schema, table in obsolete_tables
+        ]
+        all_ok &= _execute_batch_or_print(cur, drop_table_stmts, "Drop obsolete tables")
+
+        # שמירת טביעת אצבע עדכנית רק אחרי ביצוע אמיתי — וכשכולו הצליח,
+        # אחרת הריצה הבאה תדלג על DDL שנכשל ולעולם לא תתקן אותו
+        if not DRY_RUN and all_ok:
+            _save_fingerprint(_catalog_fingerprint(cur))
 
     finally:
         cur.close()
         conn.close()
 
 
-def _execute_or_print(cur, query, description):
-    """מריץ או מדפיס בהתאם ל-DRY_RUN"""
+def _catalog_fingerprint(cur):
+    """טביעת אצבע זולה של מצב הקטלוג — שאילתת ספירה אחת בלבד"""
+    cur.execute("""
+        SELECT
+            (SELECT count(*) FROM svv_datashare_objects WHERE share_name = %s),
+            (SELECT count(*) FROM information_schema.schemata
+             WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_internal')),
+            (SELECT count(*) FROM information_schema.tables
+             WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_internal'))
+    """, (DATASHARE_NAME,))
+    return list(cur.fetchone())
+
+
+def _load_cached_fingerprint():
+    try:
+        with open(_STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _save_fingerprint(fingerprint):
+    try:
+        with open(_STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f)
+    except Exception:
+        pass
+
+
+def _render_sql(obj):
+    """רינדור תצוגה ב-Python טהור ל-DRY_RUN — בלי קריאת quoting של libpq לכל פקודה"""
+    if isinstance(obj, sql.Composed):
+        return ''.join(_render_sql(part) for part in obj)
+    if isinstance(obj, sql.Identifier):
+        return '.'.join('"%s"' % part.replace('"', '""') for part in obj.strings)
+    if isinstance(obj, sql.SQL):
+        return obj.string
+    return obj.as_string(None)
+
+
+def _execute_batch_or_print(cur, statements, description):
+    """מריץ את כל הפקודות של השלב ב-execute אחד (round-trip יחיד) או מדפיס בהתאם ל-DRY_RUN.
+
+    מחזיר True אם השלב הצליח (או שלא היה מה להריץ), False אם נכשל.
+    """
+    if not statements:
+        return True
+    batch = sql.SQL(";\n").join(statements)
     if DRY_RUN:
-        print("   ➡️", query.as_string(cur))
-    else:
-        try:
-            cur.execute(query)
-            print(f"✅ {description}")
-        except Exception as e:
-            print(f"⚠️ Failed {description}: {e}")
+        print("   ➡️", _render_sql(batch))
+        return True
+    try:
+        cur.execute(batch)
+        print(f"✅ {description} ({len(statements)} statements)")
+        return True
+    except Exception as e:
+        print(f"⚠️ Failed {description}: {e}")
+        return False
 
 
 if __name__ == "__main__":
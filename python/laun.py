@@ -6,27 +6,65 @@ Simple GUI launcher for Java applications with proxy authentication
 
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
+import asyncio
 import subprocess
 import json
+import shlex
+import shutil
+import stat
+import threading
 import os
 import sys
 import re
+import time
 import platform
+from dataclasses import dataclass
+from types import MappingProxyType, SimpleNamespace
 
+# Optional C-accelerated JSON for the config file; stdlib json stays the
+# fallback so no new hard dependency is introduced
+try:
+    import orjson as _fast_json
+except ImportError:
+    _fast_json = None
 
-def find_java_installations():
+
+# Detection is expensive (filesystem walk + one subprocess per JDK), and the
+# settings window can trigger it twice in quick succession — cache the result
+_JAVA_CACHE_TTL = 60  # seconds
+_java_cache = {'result': None, 'ts': 0.0}
+
+# Compiled once; [^"]+ also avoids the backtracking of a lazy .+?
+_VERSION_RE = re.compile(r'version "([^"]+)"')
+
+
+@dataclass(frozen=True)
+class JavaInstall:
+    """A detected Java installation — attribute access beats per-entry
+    dict lookups (no slots=True: that's 3.10+, we support 3.8)"""
+    path: str
+    version: str
+    name: str
+
+
+def find_java_installations(force_refresh=False):
     """Find all Java installations on the system"""
+    if not force_refresh and _java_cache['result'] is not None \
+            and time.time() - _java_cache['ts'] < _JAVA_CACHE_TTL:
+        return _java_cache['result']
+
     java_paths = []
+    candidates = []  # (path, name) pairs; versions are probed afterwards
     system = platform.system()
-    
-    # Check common locations and PATH
+
+    # Check PATH
+    path_java = check_java_in_path()
+    if path_java:
+        java_paths.append(path_java)
+
+    # Check common installation directories
     if system == "Windows":
-        # Check PATH
-        path_java = check_java_in_path()
-        if path_java:
-            java_paths.append(path_java)
-        
-        # Check common installation directories
+        java_name = "java.exe"
         common_dirs = [
             r"C:\Program Files\Java",
             r"C:\Program Files (x86)\Java",
@@ -35,125 +73,141 @@ def find_java_installations():
             r"C:\Program Files\Zulu",
             os.path.expanduser(r"~\\.jdks")
         ]
-        
-        for base_dir in common_dirs:
-            if os.path.exists(base_dir):
-                try:
-                    for item in os.listdir(base_dir):
-                        java_exe = os.path.join(base_dir, item, "bin", "java.exe")
-                        if os.path.isfile(java_exe):
-                            version = get_java_version(java_exe)
-                            if version:
-                                java_paths.append({
-                                    'path': java_exe,
-                                    'version': version,
-                                    'name': item
-                                })
-                except:
-                    pass
-        
-        # Check registry
-        java_from_registry = find_java_in_registry()
-        java_paths.extend(java_from_registry)
-    
-    elif system == "Linux" or system == "Darwin":  # macOS
-        # Check PATH
-        path_java = check_java_in_path()
-        if path_java:
-            java_paths.append(path_java)
-        
-        # Check common locations
+    else:  # Linux / macOS
+        java_name = "java"
         common_dirs = [
             "/usr/lib/jvm",
             "/usr/java",
             "/Library/Java/JavaVirtualMachines",  # macOS
             os.path.expanduser("~/.jdks")
         ]
-        
-        for base_dir in common_dirs:
-            if os.path.exists(base_dir):
-                try:
-                    for item in os.listdir(base_dir):
-                        java_bin = os.path.join(base_dir, item, "bin", "java")
-                        if os.path.isfile(java_bin):
-                            version = get_java_version(java_bin)
-                            if version:
-                                java_paths.append({
-                                    'path': java_bin,
-                                    'version': version,
-                                    'name': item
-                                })
-                except:
-                    pass
-    
-    # Remove duplicates (same path)
-    seen_paths = set()
-    unique_javas = []
-    for java in java_paths:
-        if isinstance(java, dict):
-            path = java['path']
-        else:
-            path = java
-        
-        if path not in seen_paths:
-            seen_paths.add(path)
-            unique_javas.append(java)
-    
+
+    for base_dir in common_dirs:
+        # scandir doubles as the existence check — one syscall instead of
+        # a separate os.path.exists stat per base directory
+        try:
+            with os.scandir(base_dir) as it:
+                # DirEntry's cached type info avoids an extra stat per item.
+                # Prune hidden entries (e.g. /usr/lib/jvm/.*.jinfo) before any
+                # further check; following symlinks keeps dirs like
+                # default-java, which realpath-dedup collapses later anyway
+                for entry in it:
+                    if entry.name.startswith('.') or not entry.is_dir(follow_symlinks=True):
+                        continue
+                    java_exe = os.path.join(entry.path, "bin", java_name)
+                    if os.path.isfile(java_exe):
+                        candidates.append((java_exe, entry.name))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+    # Check registry (Windows only)
+    candidates.extend(find_java_in_registry())
+
+    # Canonicalize and dedupe before probing — a symlinked JDK (e.g.
+    # /usr/lib/jvm/default-java) or a registry JavaHome pointing at an
+    # already-scanned install shouldn't get a second subprocess probe
+    seen_real = set()
+    if path_java:
+        seen_real.add(os.path.normcase(os.path.realpath(path_java.path)))
+    deduped = []
+    for path, name in candidates:
+        real = os.path.normcase(os.path.realpath(path))
+        if real not in seen_real:
+            seen_real.add(real)
+            deduped.append((path, name))
+    candidates = deduped
+
+    # Probe versions in parallel — all java -version subprocesses run under a
+    # single event loop, cheaper than a pool of blocked worker threads
+    if candidates:
+        async def _probe_all():
+            return await asyncio.gather(
+                *(_get_java_version_async(path) for path, _ in candidates))
+
+        versions = asyncio.run(_probe_all())
+        for (path, name), version in zip(candidates, versions):
+            if version:
+                java_paths.append(JavaInstall(path=path, version=version, name=name))
+
+    # Remove duplicates (same path) — dict keeps first occurrence and order
+    unique_javas = list({java.path: java for java in java_paths}.values())
+
+    _java_cache['result'] = unique_javas
+    _java_cache['ts'] = time.time()
     return unique_javas
 
 
 def check_java_in_path():
     """Check if java is available in PATH"""
-    try:
-        result = subprocess.run(['java', '-version'], 
-                              capture_output=True, 
-                              timeout=3)
-        if result.returncode == 0:
-            version = get_java_version('java')
-            if version:
-                return {
-                    'path': 'java',
-                    'version': version,
-                    'name': 'java (from PATH)'
-                }
-    except:
-        pass
+    # shutil.which is a handful of stats — skip the fork/exec entirely
+    # when java isn't on PATH at all
+    java_exe = shutil.which('java')
+    if java_exe is None:
+        return None
+
+    # get_java_version already runs java -version; a separate returncode
+    # probe would just spawn the same subprocess twice
+    version = get_java_version(java_exe)
+    if version:
+        return JavaInstall(path=java_exe, version=version, name='java (from PATH)')
     return None
 
 
+def _parse_java_version(output):
+    """Parse 'java -version' output into a short display string"""
+    # Examples: "java version "1.8.0_291"" or "openjdk version "11.0.11""
+    version_match = _VERSION_RE.search(output)
+    if version_match:
+        version_str = version_match.group(1)
+        
+        # Simplify version (e.g., "1.8.0_291" -> "Java 8", "11.0.11" -> "Java 11")
+        if version_str.startswith('1.'):
+            # Old versioning (1.8 = Java 8)
+            major = version_str.split('.')[1]
+        else:
+            # New versioning (11.x = Java 11)
+            major = version_str.split('.')[0]
+        return f"Java {major}"
+    
+    return "Java (unknown version)"
+
+
 def get_java_version(java_path):
     """Get Java version from executable"""
     try:
+        # java -version writes to stderr only; dropping stdout skips a pipe
+        # plus the decode of an empty stream
         result = subprocess.run([java_path, '-version'], 
-                              capture_output=True, 
+                              stderr=subprocess.PIPE,
+                              stdout=subprocess.DEVNULL,
                               timeout=3,
                               text=True)
         
-        output = result.stderr + result.stdout
-        
-        # Parse version from output
-        # Examples: "java version "1.8.0_291"" or "openjdk version "11.0.11""
-        version_match = re.search(r'version "(.+?)"', output)
-        if version_match:
-            version_str = version_match.group(1)
-            
-            # Simplify version (e.g., "1.8.0_291" -> "Java 8", "11.0.11" -> "Java 11")
-            if version_str.startswith('1.'):
-                # Old versioning (1.8 = Java 8)
-                major = version_str.split('.')[1]
-                return f"Java {major}"
-            else:
-                # New versioning (11.x = Java 11)
-                major = version_str.split('.')[0]
-                return f"Java {major}"
-        
-        return "Java (unknown version)"
+        return _parse_java_version(result.stderr)
+    except:
+        return None
+
+
+async def _get_java_version_async(java_path):
+    """Async variant of get_java_version for batch probing — one event loop
+    multiplexes all java -version subprocesses instead of a thread per probe"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            java_path, '-version',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE)
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=3)
+        except asyncio.TimeoutError:
+            proc.kill()
+            return None
+        return _parse_java_version(stderr.decode(errors='replace'))
     except:
         return None
 
 
 def find_java_in_registry():
-    """Find Java installations in Windows Registry"""
+    """Find Java installation candidates (path, name) in Windows Registry"""
     java_paths = []
     
     if platform.system() != "Windows":
@@ -171,36 +225,20 @@ def find_java_in_registry():
         
         for hkey, subkey in registry_paths:
             try:
-                key = winreg.OpenKey(hkey, subkey)
-                
-                # Get all versions
-                i = 0
-                while True:
-                    try:
-                        version = winreg.EnumKey(key, i)
-                        version_key = winreg.OpenKey(key, version)
-                        
+                with winreg.OpenKey(hkey, subkey) as key:
+                    # Subkey count is known up front — no EnumKey-until-OSError loop
+                    num_subkeys = winreg.QueryInfoKey(key)[0]
+                    for i in range(num_subkeys):
                         try:
-                            java_home = winreg.QueryValueEx(version_key, "JavaHome")[0]
-                            java_exe = os.path.join(java_home, "bin", "java.exe")
-                            
-                            if os.path.isfile(java_exe):
-                                java_version = get_java_version(java_exe)
-                                if java_version:
-                                    java_paths.append({
-                                        'path': java_exe,
-                                        'version': java_version,
-                                        'name': f"Registry: {version}"
-                                    })
-                        except:
+                            version = winreg.EnumKey(key, i)
+                            with winreg.OpenKey(key, version) as version_key:
+                                java_home = winreg.QueryValueEx(version_key, "JavaHome")[0]
+                                java_exe = os.path.join(java_home, "bin", "java.exe")
+                                
+                                if os.path.isfile(java_exe):
+                                    java_paths.append((java_exe, f"Registry: {version}"))
+                        except OSError:
                             pass
-                        
-                        winreg.CloseKey(version_key)
-                        i += 1
-                    except OSError:
-                        break
-                
-                winreg.CloseKey(key)
             except:
                 pass
     except ImportError:
@@ -208,9 +246,24 @@ def find_java_in_registry():
     
     return java_paths
 
+def _split_args(value):
+    """Split a free-text argument string, tolerating user typos.
+
+    shlex keeps quoted arguments (e.g. -Dfoo="hello world") intact, but
+    raises on an unbalanced quote — which a user can easily save through
+    the settings fields. Fall back to plain whitespace splitting then.
+    """
+    try:
+        return shlex.split(value)
+    except ValueError:
+        return value.split()
+
+
 class Config:
     """Configuration manager"""
-    DEFAULT_CONFIG = {
+    # Read-only view — accidental mutation of the class-level defaults would
+    # silently leak into every later fallback load
+    DEFAULT_CONFIG = MappingProxyType({
         'JarPath': 'app.jar',
         'JavaPath': 'java',
         'JvmArgs': '-Xmx512m',
@@ -218,42 +271,72 @@ class Config:
         'UsernameProperty': 'http.proxyUser',
         'PasswordProperty': 'http.proxyPassword',
         'LastUsername': ''
-    }
+    })
     
     def __init__(self, config_file='config.json'):
         self.config_file = config_file
+        self._dirty = False
         self.data = self.load()
     
     def load(self):
         """Load configuration from JSON file"""
         try:
             if os.path.exists(self.config_file):
+                if _fast_json is not None:
+                    with open(self.config_file, 'rb') as f:
+                        return _fast_json.loads(f.read())
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             else:
-                self.save(self.DEFAULT_CONFIG)
-                return self.DEFAULT_CONFIG.copy()
+                defaults = dict(self.DEFAULT_CONFIG)
+                self.save(defaults)
+                return defaults
         except Exception as e:
             print(f"Error loading config: {e}")
-            return self.DEFAULT_CONFIG.copy()
+            return dict(self.DEFAULT_CONFIG)
     
     def save(self, data=None):
         """Save configuration to JSON file"""
         if data is None:
             data = self.data
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if _fast_json is not None:
+                with open(self.config_file, 'wb') as f:
+                    f.write(_fast_json.dumps(data, option=_fast_json.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+            self._dirty = False
         except Exception as e:
             print(f"Error saving config: {e}")
     
+    def flush(self):
+        """Write the config to disk only if something actually changed"""
+        if self._dirty:
+            self.save()
+    
     def get(self, key, default=None):
         """Get configuration value"""
         return self.data.get(key, default)
     
+    def snapshot(self):
+        """One-shot view of the launch-related keys — attribute access in the
+        hot paths instead of repeated dict lookups"""
+        # splitting here means the hot paths never re-split
+        return SimpleNamespace(
+            java_path=self.data.get('JavaPath', 'java'),
+            jvm_args=_split_args(self.data.get('JvmArgs', '')),
+            app_args=_split_args(self.data.get('AppArgs', '')),
+            jar_path=self.data.get('JarPath', 'app.jar'),
+            username_prop=self.data.get('UsernameProperty', 'http.proxyUser'),
+            password_prop=self.data.get('PasswordProperty', 'http.proxyPassword'),
+        )
+    
     def set(self, key, value):
         """Set configuration value"""
-        self.data[key] = value
+        if self.data.get(key) != value:
+            self.data[key] = value
+            self._dirty = True
 
 
 class SettingsWindow(tk.Toplevel):
@@ -391,12 +474,17 @@ class SettingsWindow(tk.Toplevel):
         progress_bar = ttk.Progressbar(progress, mode='indeterminate')
         progress_bar.pack(padx=20, pady=10, fill=tk.X)
         progress_bar.start()
-        
-        progress.update()
-        
-        # Find Java installations
-        java_installs = find_java_installations()
-        
+
+        # Run detection off the Tk main thread so the progress bar actually
+        # animates; results are marshalled back via after(0, ...)
+        def worker():
+            java_installs = find_java_installations(force_refresh=True)
+            self.after(0, lambda: self._on_java_detected(java_installs, progress))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_java_detected(self, java_installs, progress):
+        """Populate the combobox once background detection finishes"""
         progress.destroy()
         
         if not java_installs:
@@ -412,16 +500,7 @@ class SettingsWindow(tk.Toplevel):
             return
         
         # Populate combobox
-        self.java_path['values'] = []
-        items = []
-        
-        for java in java_installs:
-            if isinstance(java, dict):
-                display = f"{java['version']} - {java['path']}"
-                items.append(display)
-            else:
-                items.append(java)
-        
+        items = [f"{java.version} - {java.path}" for java in java_installs]
         self.java_path['values'] = items
         
         # Select first one
@@ -437,17 +516,16 @@ class SettingsWindow(tk.Toplevel):
     
     def detect_java_silent(self):
         """Detect Java silently on startup (without messages)"""
-        java_installs = find_java_installations()
-        
+        def worker():
+            java_installs = find_java_installations()
+            self.after(0, lambda: self._apply_silent_detection(java_installs))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _apply_silent_detection(self, java_installs):
+        """Apply silent-detection results on the Tk thread"""
         if java_installs:
-            items = []
-            for java in java_installs:
-                if isinstance(java, dict):
-                    display = f"{java['version']} - {java['path']}"
-                    items.append(display)
-                else:
-                    items.append(java)
-            
+            items = [f"{java.version} - {java.path}" for java in java_installs]
             self.java_path['values'] = items
             
             # If current value is empty or "java", set to first detected
@@ -483,7 +561,7 @@ class SettingsWindow(tk.Toplevel):
         self.config.set('UsernameProperty', self.username_prop.get())
         self.config.set('PasswordProperty', self.password_prop.get())
         
-        self.config.save()
+        self.config.flush()
         
         messagebox.showinfo("Success", "Settings saved successfully!", parent=self)
         self.destroy()
@@ -504,12 +582,18 @@ class JavaLauncher(tk.Tk):
         # Center window
         self.center_window()
         
+        # Static command parts only change when settings change — compute once
+        self._preview_after_id = None
+        self._java_ok_cache = {}  # JavaPath -> bool, probed at most once each
+        self._jar_check_cache = None  # (jar_path, ts, exists)
+        self._rebuild_preview_parts()
+        
         self.create_widgets()
         self.load_last_username()
         
         # Update command preview whenever username/password changes
-        self.username_entry.bind('<KeyRelease>', lambda e: self.update_command_preview())
-        self.password_entry.bind('<KeyRelease>', lambda e: self.update_command_preview())
+        self.username_entry.bind('<KeyRelease>', self._on_credentials_keypress)
+        self.password_entry.bind('<KeyRelease>', self._on_credentials_keypress)
     
     def center_window(self):
         """Center window on screen"""
@@ -604,45 +688,47 @@ class JavaLauncher(tk.Tk):
         else:
             self.password_entry.config(show="•")
     
+    def _rebuild_preview_parts(self):
+        """Precompute the static command parts (everything but the credentials)"""
+        cfg = self.config.snapshot()
+        
+        prefix = [cfg.java_path]
+        if cfg.jvm_args:
+            prefix.extend(cfg.jvm_args)
+        self._preview_prefix_parts = prefix
+        
+        self._username_prop = cfg.username_prop
+        self._password_prop = cfg.password_prop
+        
+        suffix = ['-jar', cfg.jar_path]
+        if cfg.app_args:
+            suffix.extend(cfg.app_args)
+        self._preview_suffix_parts = suffix
+    
+    def _on_credentials_keypress(self, event=None):
+        """Debounce preview refresh so rapid typing coalesces into one update"""
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(50, self._refresh_preview)
+    
+    def _refresh_preview(self):
+        self._preview_after_id = None
+        self.update_command_preview()
+    
     def update_command_preview(self):
         """Update the command preview display"""
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
         
-        # Build command for preview
-        cmd_parts = []
-        
-        # Java path
-        java_path = self.config.get('JavaPath', 'java')
-        cmd_parts.append(java_path)
-        
-        # JVM args
-        jvm_args = self.config.get('JvmArgs', '')
-        if jvm_args:
-            cmd_parts.extend(jvm_args.split())
-        
-        # Username property
-        username_prop = self.config.get('UsernameProperty', 'http.proxyUser')
-        if username:
-            cmd_parts.append(f'-D{username_prop}={username}')
-        else:
-            cmd_parts.append(f'-D{username_prop}=<username>')
-        
-        # Password property (masked)
-        password_prop = self.config.get('PasswordProperty', 'http.proxyPassword')
+        # Only the two -D credential properties change per keystroke;
+        # the rest of the command is served from the cached parts
+        cmd_parts = list(self._preview_prefix_parts)
+        cmd_parts.append(f'-D{self._username_prop}={username or "<username>"}')
         if password:
-            cmd_parts.append(f'-D{password_prop}={"*" * len(password)}')
+            cmd_parts.append(f'-D{self._password_prop}={"*" * len(password)}')
         else:
-            cmd_parts.append(f'-D{password_prop}=<password>')
-        
-        # JAR
-        jar_path = self.config.get('JarPath', 'app.jar')
-        cmd_parts.extend(['-jar', jar_path])
-        
-        # App args
-        app_args = self.config.get('AppArgs', '')
-        if app_args:
-            cmd_parts.extend(app_args.split())
+            cmd_parts.append(f'-D{self._password_prop}=<password>')
+        cmd_parts.extend(self._preview_suffix_parts)
         
         # Join command
         command = ' '.join(cmd_parts)
@@ -655,27 +741,46 @@ class JavaLauncher(tk.Tk):
     
     def open_settings(self):
         """Open settings dialog"""
-        SettingsWindow(self, self.config)
-        # Update command preview after settings might have changed
+        dialog = SettingsWindow(self, self.config)
+        self.wait_window(dialog)
+        # Settings may have changed — drop cached probe results and rebuild
+        self._java_ok_cache.clear()
+        self._jar_check_cache = None
+        self._rebuild_preview_parts()
         self.update_command_preview()
     
     def check_java(self):
-        """Check if Java is available"""
+        """Check if Java is available (probed once per configured path)"""
+        java_path = self.config.get('JavaPath', 'java')
+        cached = self._java_ok_cache.get(java_path)
+        if cached is not None:
+            return cached
         try:
-            java_path = self.config.get('JavaPath', 'java')
             result = subprocess.run(
                 [java_path, '-version'],
                 capture_output=True,
                 timeout=3
             )
-            return result.returncode == 0
+            ok = result.returncode == 0
         except:
-            return False
+            ok = False
+        self._java_ok_cache[java_path] = ok
+        return ok
     
     def check_jar(self):
-        """Check if JAR file exists"""
+        """Check if JAR file exists (stat cached briefly — a UNC/network
+        jar path can block, and a double-click shouldn't stat twice)"""
         jar_path = self.config.get('JarPath', '')
-        return os.path.isfile(jar_path)
+        now = time.time()
+        cached = self._jar_check_cache
+        if cached is not None and cached[0] == jar_path and now - cached[1] < 2:
+            return cached[2]
+        try:
+            exists = stat.S_ISREG(os.stat(jar_path).st_mode)
+        except OSError:
+            exists = False
+        self._jar_check_cache = (jar_path, now, exists)
+        return exists
     
     def launch(self):
         """Launch Java application"""
@@ -711,31 +816,29 @@ class JavaLauncher(tk.Tk):
             return
         
         try:
-            # Save username (not password!)
+            # Save username (not password!) — debounced so repeated launches
+            # don't rewrite the file each click
             self.config.set('LastUsername', username)
-            self.config.save()
+            self.after(500, self.config.flush)
             
             # Build command
-            cmd = [self.config.get('JavaPath', 'java')]
+            cfg = self.config.snapshot()
+            cmd = [cfg.java_path]
             
             # Add JVM args
-            jvm_args = self.config.get('JvmArgs', '')
-            if jvm_args:
-                cmd.extend(jvm_args.split())
+            if cfg.jvm_args:
+                cmd.extend(cfg.jvm_args)
             
             # Add username and password properties
-            username_prop = self.config.get('UsernameProperty', 'http.proxyUser')
-            password_prop = self.config.get('PasswordProperty', 'http.proxyPassword')
-            cmd.append(f'-D{username_prop}={username}')
-            cmd.append(f'-D{password_prop}={password}')
+            cmd.append(f'-D{cfg.username_prop}={username}')
+            cmd.append(f'-D{cfg.password_prop}={password}')
             
             # Add JAR
-            cmd.extend(['-jar', self.config.get('JarPath', '')])
+            cmd.extend(['-jar', cfg.jar_path])
             
             # Add app args
-            app_args = self.config.get('AppArgs', '')
-            if app_args:
-                cmd.extend(app_args.split())
+            if cfg.app_args:
+                cmd.extend(cfg.app_args)
             
             # Launch without console window
             # For Windows: use CREATE_NO_WINDOW flag
@@ -1,6 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import psycopg2
 from psycopg2 import sql
-from config import REDSHIFT_CONFIG, DATASHARE_NAME, DRY_RUN
+from psycopg2.pool import ThreadedConnectionPool
+from config import REDSHIFT_CONFIG, DATASHARE_NAME, DRY_RUN, USE_DRIVER_METADATA_API
+
+# הדרייבר של Amazon אופציונלי — בלעדיו עובדים רגיל דרך psycopg2
+try:
+    import redshift_connector
+except ImportError:
+    redshift_connector = None
+
+# כמה sessions מקביליים מול הקלאסטר — מוגבל כדי לא לרוקן את תור ה-WLM
+MAX_WORKERS = 16
 
 def update_datashare():
     conn = psycopg2.connect(**REDSHIFT_CONFIG)
@@ -9,53 +21,163 @@ def update_datashare():
 
     try:
         # --- שלב 1: שליפת סכמות ---
+        schemas = _discover_schemas(cur)
+
+        # --- שלב 1ב: אילו סכמות כבר משותפות ---
+        # עדיף לדלג מראש מאשר לשלם round-trip על ALTER שייכשל כ-duplicate;
+        # ADD ALL TABLES + INCLUDENEW מכסים את הטבלאות, אז אין צורך
+        # בשליפת שמות טבלאות מהקטלוג בכלל. התוצאה היא שמות סכמות בלבד
+        # (מאות שורות) — אין הצדקה לקורסור בצד השרת, ו-Redshift ממילא
+        # לא תומך ב-DECLARE ... WITH HOLD מחוץ לטרנזקציה
+        cur.execute("""
+            SELECT object_name
+            FROM svv_datashare_objects
+            WHERE share_name = %s AND object_type = 'schema'
+        """, (DATASHARE_NAME,))
+        existing_schemas = {object_name for (object_name,) in cur}
+
+        # --- שלב 1ג: רק סכמות שמחזיקות לפחות טבלה אחת ---
+        # סכמה ריקה עולה שני round-trips של ADD SCHEMA/INCLUDE NEW
+        # בלי שום דבר לשתף — מסננים אותן בסריקת קטלוג אחת
         cur.execute("""
-            SELECT schema_name
-            FROM information_schema.schemata
-            WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+            SELECT table_schema
+            FROM information_schema.tables
+            WHERE table_schema NOT IN ('information_schema', 'pg_catalog', 'pg_internal')
+              AND table_schema NOT LIKE 'pg\_%' ESCAPE '\'
+            GROUP BY 1
+            HAVING COUNT(*) > 0
         """)
-        schemas = [row[0] for row in cur.fetchall()]
-
-        for schema in schemas:
-            print(f"\n📂 Schema: {schema}")
-
-            # פקודות על הסכמה
-            add_schema = sql.SQL("ALTER DATASHARE {} ADD SCHEMA {}").format(
-                sql.Identifier(DATASHARE_NAME),
-                sql.Identifier(schema)
-            )
-            include_new = sql.SQL("ALTER DATASHARE {} ADD SCHEMA {} INCLUDE NEW").format(
-                sql.Identifier(DATASHARE_NAME),
-                sql.Identifier(schema)
-            )
-
-            _execute_or_print(cur, add_schema, f"Add schema {schema}")
-            _execute_or_print(cur, include_new, f"Add schema {schema} with INCLUDE NEW")
-
-            # --- שלב 2: טבלאות ---
-            cur.execute(sql.SQL("""
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = %s
-            """), [schema])
-
-            tables = [row[0] for row in cur.fetchall()]
-            for table in tables:
-                add_table = sql.SQL("ALTER DATASHARE {} ADD TABLE {}.{}").format(
-                    sql.Identifier(DATASHARE_NAME),
-                    sql.Identifier(schema),
-                    sql.Identifier(table)
-                )
-                _execute_or_print(cur, add_table, f"Add table {schema}.{table}")
+        populated_schemas = {table_schema for (table_schema,) in cur.fetchall()}
+        schemas = [schema for schema in schemas if schema in populated_schemas]
 
     finally:
         cur.close()
         conn.close()
 
+    if not schemas:
+        return
+
+    # מזהה ה-datashare קבוע לכל הריצה — ה-quoting של Identifier רץ
+    # ב-Python, אז בונים אותו פעם אחת ולא פעמיים לכל סכמה + לכל טבלה
+    ds_id = sql.Identifier(DATASHARE_NAME)
+
+    # --- שלב 2: עבודה פר-סכמה במקביל ---
+    # ה-DDL של כל סכמה בלתי-תלוי (הנעילות ב-Redshift הן פר-אובייקט),
+    # אז מפזרים את הסכמות על pool של חיבורים במקום לטפטף בטור
+    workers = min(MAX_WORKERS, len(schemas))
+    pool = ThreadedConnectionPool(1, workers, **REDSHIFT_CONFIG)
+    try:
+        def process_schema(schema):
+            worker_conn = pool.getconn()
+            worker_conn.autocommit = True
+            worker_cur = worker_conn.cursor()
+            try:
+                print(f"\n📂 Schema: {schema}")
+
+                # צוברים את כל ה-DDL של הסכמה ושולחים ב-execute אחד —
+                # round-trip יחיד במקום אחד לכל פקודה; מה שכבר משותף מדולג
+                if schema in existing_schemas:
+                    # INCLUDE NEW כבר מכסה טבלאות חדשות בסכמה משותפת
+                    print(f"✅ Schema {schema} already up to date")
+                    return
+
+                schema_id = sql.Identifier(schema)
+                # ADD ALL TABLES אחד במקום ALTER לכל טבלה — K round-trips
+                # ו-K נעילות קטלוג הופכים לפקודה אחת פר סכמה
+                statements = [
+                    sql.SQL("ALTER DATASHARE {} ADD SCHEMA {}").format(ds_id, schema_id),
+                    sql.SQL("ALTER DATASHARE {} SET INCLUDENEW = TRUE FOR SCHEMA {}").format(ds_id, schema_id),
+                    sql.SQL("ALTER DATASHARE {} ADD ALL TABLES IN SCHEMA {}").format(ds_id, schema_id),
+                ]
+
+                # מרנדרים פעם אחת למחרוזת multi-statement — psycopg2 שולח
+                # את כולה ב-burst רשת אחד, בלי parse/round-trip לכל פקודה.
+                # ב-DRY_RUN מרנדרים ב-Python טהור — בלי קריאות escape של
+                # libpq לכל פקודה רק בשביל הדפסה
+                if DRY_RUN:
+                    batch = "; ".join(_render_sql(stmt) for stmt in statements)
+                else:
+                    batch = "; ".join(stmt.as_string(worker_cur) for stmt in statements)
+                _execute_or_print(worker_cur, batch, f"Datashare DDL for schema {schema} ({len(statements)} statements)")
+            finally:
+                worker_cur.close()
+                pool.putconn(worker_conn)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process_schema, schemas))
+    finally:
+        pool.closeall()
+
+def _discover_schemas(cur):
+    """מחזיר את הסכמות המועמדות לשיתוף — local בלבד, בלי pg_*"""
+    system_schemas = {'information_schema', 'pg_catalog', 'pg_internal'}
+
+    if USE_DRIVER_METADATA_API and redshift_connector is not None:
+        # ה-metadata API של הדרייבר של Amazon רץ בנתיב פנימי ממוטב
+        # ושורד שינויים בפריסת טבלאות המערכת.
+        # redshift_connector לא מקבל את המפתחות של libpq (dbname,
+        # keepalives*) — בונים את הארגומנטים שלו במפורש
+        rs_conn = redshift_connector.connect(
+            host=REDSHIFT_CONFIG["host"],
+            port=REDSHIFT_CONFIG["port"],
+            database=REDSHIFT_CONFIG["dbname"],
+            user=REDSHIFT_CONFIG["user"],
+            password=REDSHIFT_CONFIG["password"],
+        )
+        try:
+            rs_cur = rs_conn.cursor()
+            # עמודות get_schemas: TABLE_SCHEM, TABLE_CATALOG
+            rows = rs_cur.get_schemas()
+            # get_schemas לא חושף schema_type, אז מסננים סכמות
+            # external/shared מול svv_all_schemas — אחרת חוזרים
+            # ה-ALTERים הנידונים לכישלון שהסינון ל-local כבר חסך
+            rs_cur.execute("""
+                SELECT schema_name
+                FROM svv_all_schemas
+                WHERE database_name = current_database()
+                  AND schema_type = 'local'
+            """)
+            local_schemas = {row[0] for row in rs_cur.fetchall()}
+        finally:
+            rs_conn.close()
+        return [
+            row[0] for row in rows
+            if row[0] in local_schemas
+            and row[0] not in system_schemas
+            and not row[0].startswith('pg_')
+        ]
+
+    # SHOW SCHEMAS הוא נתיב המטא-דאטה הממוטב של Redshift — מהיר בהרבה
+    # מסריקת information_schema.schemata על קלאסטר עמוס
+    cur.execute(sql.SQL("SHOW SCHEMAS FROM DATABASE {}").format(
+        sql.Identifier(REDSHIFT_CONFIG["dbname"])
+    ))
+    # עמודות: database_name, schema_name, schema_owner, schema_type, ...
+    # רק סכמות local שאינן pg_* — ALTER DATASHARE על pg_automv/pg_temp_*
+    # נכשל תמיד, וכל ניסיון כזה עולה round-trip ופרמוט שגיאה
+    return [
+        row[1] for row in cur.fetchall()
+        if row[1] not in system_schemas
+        and not row[1].startswith('pg_')
+        and row[3] == 'local'
+    ]
+
+
+def _render_sql(obj):
+    """רינדור תצוגה ב-Python טהור ל-DRY_RUN — בלי מעבר דרך libpq"""
+    if isinstance(obj, sql.Composed):
+        return ''.join(_render_sql(part) for part in obj)
+    if isinstance(obj, sql.Identifier):
+        return '.'.join('"%s"' % part.replace('"', '""') for part in obj.strings)
+    if isinstance(obj, sql.SQL):
+        return obj.string
+    return obj.as_string(None)
+
+
 def _execute_or_print(cur, query, description):
     """מריץ או מדפיס בהתאם ל-DRY_RUN"""
     if DRY_RUN:
-        print("   ➡️", query.as_string(cur))
+        print("   ➡️", query)
     else:
         try:
             cur.execute(query)
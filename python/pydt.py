@@ -1,44 +1,133 @@
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
 import pyarrow.parquet as pq
 import s3fs
 
+# cache מקומי של סכמות לפי ETag — HEAD זול מחליף הורדת footer ופענוח
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pydt")
+
+
+def load_schema(path, fs):
+    """טוען סכמת Parquet; אם ה-ETag לא השתנה מאז הריצה הקודמת — מהדיסק"""
+    info = fs.info(path)
+    etag = str(info.get('ETag', '')).strip('"')
+    cache_file = os.path.join(
+        _CACHE_DIR,
+        hashlib.sha1(f"{path}:{etag}".encode()).hexdigest() + ".arrow"
+    )
+    if etag:
+        try:
+            with open(cache_file, 'rb') as cf:
+                return pa.ipc.read_schema(pa.BufferReader(cf.read()))
+        except (FileNotFoundError, pa.ArrowInvalid):
+            pass
+
+    schema = _read_footer_schema(path, fs)
+
+    if etag:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'wb') as cf:
+            cf.write(schema.serialize().to_pybytes())
+    return schema
+
+
+def _read_footer_schema(path, fs, attempts=8):
+    """קורא את הסכמה מה-footer עם retry ו-backoff מעריכי על OSError.
+
+    S3 זורק SLOW_DOWN / socket reset חולפים תחת עומס מקבילי — בלי retry
+    כל כשל כזה מפיל את הריצה כולה.
+    """
+    delay = 0.5
+    for attempt in range(1, attempts + 1):
+        try:
+            # פותחים את האובייקט פעם אחת; read_metadata מפענח רק את הסכמה
+            # מה-footer בלי להחיות אובייקטי statistics לכל column chunk —
+            # בקבצים עם אלפי עמודות זה רוב זמן הפענוח
+            with fs.open(path, 'rb') as f:
+                md = pq.read_metadata(f)
+                return md.schema.to_arrow_schema()
+        except OSError as e:
+            if attempt == attempts:
+                raise
+            print(f"⚠️ Footer read failed for {path} (attempt {attempt}/{attempts}): {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+def load_schema_interned(paths, fs):
+    """טוען סכמות לרשימת קבצים ומאחד עותקים זהים לאובייקט משותף אחד.
+
+    בדאטה-לייק ממוזער כל הקבצים תחת prefix חולקים בדרך כלל סכמה זהה —
+    בלי interning כל קובץ מחזיק FileMetaData/Schema משלו וה-RSS גדל
+    ליניארית במספר הקבצים.
+    """
+    paths = list(paths)
+    # קריאת ה-footers במקביל — העבודה היא כולה latency של S3 (~30-80ms
+    # לקובץ), אז חפיפה מורידה את זמן הקיר מ-N*RTT ל-N/concurrency*RTT
+    with ThreadPoolExecutor(max_workers=min(32, max(1, len(paths)))) as executor:
+        loaded = list(executor.map(lambda file_path: load_schema(file_path, fs), paths))
+
+    unique_schemas = {}
+    schemas = []
+    for schema in loaded:
+        key = schema.serialize().to_pybytes()
+        schemas.append(unique_schemas.setdefault(key, schema))
+    return schemas
+
 # נתיב לקובץ ה-Parquet שלך
 path = "s3://my-analytics-bucket/data/events/2025-10-20/events.parquet"
 
 # יצירת גישה ל-S3
 fs = s3fs.S3FileSystem()
 
-# קריאת הסכמה בלבד
-dataset = pq.ParquetDataset(path, filesystem=fs)
-schema = dataset.schema.to_arrow_schema()
-
-# מיפוי טיפוסי PyArrow → Redshift
-type_map = {
-    "bool": "BOOLEAN",
-    "int8": "SMALLINT",
-    "int16": "SMALLINT",
-    "int32": "INTEGER",
-    "int64": "BIGINT",
-    "uint8": "SMALLINT",
-    "uint16": "INTEGER",
-    "uint32": "BIGINT",
-    "uint64": "BIGINT",
-    "float16": "REAL",
-    "float32": "REAL",
-    "float64": "DOUBLE PRECISION",
-    "string": "VARCHAR",
-    "binary": "VARBYTE",
-    "large_string": "VARCHAR",
-    "timestamp[ns]": "TIMESTAMP",
-    "timestamp[us]": "TIMESTAMP",
-    "timestamp[ms]": "TIMESTAMP",
-    "date32": "DATE",
-    "date64": "DATE",
-    "list<item: int64>": "SUPER",      # nested → SUPER
-    "struct<...>": "SUPER",            # struct → SUPER
+# קריאת הסכמה בלבד — דרך ה-cache לפי ETag
+schema = load_schema(path, fs)
+
+# מיפוי טיפוסי PyArrow → Redshift — מפתחות DataType אמיתיים,
+# בלי str() והקצאת מחרוזת לכל עמודה בסכמות רחבות
+TYPE_MAP = {
+    pa.bool_(): "BOOLEAN",
+    pa.int8(): "SMALLINT",
+    pa.int16(): "SMALLINT",
+    pa.int32(): "INTEGER",
+    pa.int64(): "BIGINT",
+    pa.uint8(): "SMALLINT",
+    pa.uint16(): "INTEGER",
+    pa.uint32(): "BIGINT",
+    pa.uint64(): "BIGINT",
+    pa.float16(): "REAL",
+    pa.float32(): "REAL",
+    pa.float64(): "DOUBLE PRECISION",
+    pa.string(): "VARCHAR",
+    pa.large_string(): "VARCHAR",
+    pa.binary(): "VARBYTE",
+    pa.date32(): "DATE",
+    pa.date64(): "DATE",
 }
 
-# הדפסה של הסכמה עם סוגי הנתונים
-for field in schema:
-    arrow_type = str(field.type)
-    rs_type = type_map.get(arrow_type, "SUPER")  # ברירת מחדל
-    print(f"{field.name}: {rs_type} ({arrow_type})")
+
+def redshift_type(arrow_type):
+    """ממפה טיפוס Arrow לטיפוס Redshift, כולל משפחות עם פרמטרים"""
+    rs_type = TYPE_MAP.get(arrow_type)
+    if rs_type is not None:
+        return rs_type
+    # משפחות עם פרמטרים (unit/tz, precision/scale) — מפתח קבוע לא יתפוס אותן
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP"
+    if pa.types.is_decimal(arrow_type):
+        return f"DECIMAL({arrow_type.precision},{arrow_type.scale})"
+    if pa.types.is_list(arrow_type) or pa.types.is_struct(arrow_type) or pa.types.is_map(arrow_type):
+        return "SUPER"  # nested → SUPER
+    return "SUPER"  # ברירת מחדל
+
+
+# הדפסה של הסכמה עם סוגי הנתונים — כתיבה אחת ל-stdout במקום
+# print (ו-flush + syscall) לכל עמודה
+sys.stdout.write(
+    "\n".join(f"{field.name}: {redshift_type(field.type)} ({field.type})" for field in schema) + "\n"
+)